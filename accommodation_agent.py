@@ -1,8 +1,25 @@
+import os
+import re
+import stat
+import getpass
+import asyncio
+import csv
+import orjson
+import heapq
 import time
-import json
-import pandas as pd
+import queue
+import atexit
+import tempfile
+import threading
+import requests
+import lxml.html
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlencode, quote
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -19,6 +36,244 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Seconds to wait on plain HTTP requests
+HTTP_TIMEOUT = 30
+
+# Listing detail pages fetched at once by enrich_listings
+ENRICH_CONCURRENCY = 5
+
+# Must-haves from the strategy document, used when no amenities are given
+DEFAULT_AMENITIES = ("kitchen", "wifi", "air_conditioning")
+
+# Cookie set once the OneTrust consent banner has been dismissed
+_CONSENT_COOKIE = "OptanonAlertBoxClosed"
+
+# Requests the browser never makes: web fonts, trackers and ad scripts
+_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*hotjar.com*", "*bat.bing.com*",
+]
+
+# undetected-chromedriver patches one shared chromedriver binary on start,
+# so drivers requested from several threads are started one at a time
+_uc_start_lock = threading.Lock()
+
+# Persistent Chrome profiles currently claimed by a browser in this process
+_profiles_lock = threading.Lock()
+_profiles_in_use = set()
+
+def _profiles_root() -> str:
+    """Per-user directory for the Chrome profiles, private to this user
+    
+    Profiles hold cookies and session state, so they must not sit at
+    predictable paths in the shared temp directory where another local
+    user could create or read them first.
+    """
+    uid = os.getuid() if hasattr(os, "getuid") else None
+    root = os.path.join(tempfile.gettempdir(), f"bookingagent-{uid if uid is not None else getpass.getuser()}")
+    os.makedirs(root, mode=0o700, exist_ok=True)
+    if uid is not None:
+        info = os.lstat(root)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != uid:
+            raise PermissionError(f"Chrome profile directory {root} is not a directory owned by this user")
+        if stat.S_IMODE(info.st_mode) != 0o700:
+            os.chmod(root, 0o700)
+    return root
+
+def _claim_profile_dir(headless: bool) -> str:
+    """Pick a persistent Chrome profile directory that no browser is using
+    
+    Profiles survive between runs so cookies such as the consent state
+    carry over. Chrome cannot share a profile between live browsers, so
+    each concurrent driver gets its own numbered slot.
+    """
+    mode = "headless" if headless else "headed"
+    root = _profiles_root()
+    with _profiles_lock:
+        slot = 0
+        while True:
+            path = os.path.join(root, f"{mode}-{slot}")
+            if path not in _profiles_in_use and not _profile_locked(path):
+                _profiles_in_use.add(path)
+                return path
+            slot += 1
+
+def _profile_locked(path: str) -> bool:
+    """Whether a live Chrome process holds the profile
+    
+    Chrome's SingletonLock is a symlink to ``hostname-PID``. A crashed
+    browser leaves it behind, so it only counts while that PID is alive.
+    """
+    try:
+        target = os.readlink(os.path.join(path, "SingletonLock"))
+        pid = int(target.rsplit("-", 1)[1])
+    except (OSError, IndexError, ValueError):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, but owned by another user
+        return True
+    return True
+
+def _release_profile_dir(path: Optional[str]):
+    with _profiles_lock:
+        _profiles_in_use.discard(path)
+
+# Compiled once; extract_price runs for every result card
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+
+@lru_cache(maxsize=8192)
+def _extract_price(price_text: str) -> float:
+    """Numeric price in a price string, or 0.0; cached since fee strings repeat across pages"""
+    # Remove currency symbols and extract numbers
+    price_match = _PRICE_RE.search(price_text.replace(',', ''))
+    return float(price_match.group()) if price_match else 0.0
+
+# Common cookie accept buttons, as ready-made locators
+_COOKIE_SELECTORS = tuple(
+    (By.CSS_SELECTOR, selector) for selector in (
+        "button[data-testid='cookie-banner-accept']",
+        "button[aria-label*='Accept']",
+        "button[aria-label*='Accept all']",
+        ".cookie-accept",
+        "#onetrust-accept-btn-handler"
+    )
+)
+
+# Satisfied by whichever cookie accept button becomes clickable first
+_COOKIE_BUTTON_CLICKABLE = EC.any_of(
+    *(EC.element_to_be_clickable(locator) for locator in _COOKIE_SELECTORS)
+)
+
+_BOOKING_PROPERTY_FILTER = (By.CSS_SELECTOR, "[data-testid='property-type-filter']")
+_BOOKING_PRICE_FILTER = (By.CSS_SELECTOR, "[data-testid='price-filter']")
+
+# Result cards; their presence means the results page has rendered
+_BOOKING_RESULTS = (By.CSS_SELECTOR, "[data-testid='property-card']")
+_AIRBNB_RESULTS = (By.CSS_SELECTOR, "[data-testid='listing-card']")
+_BOOKING_CARDS_XPATH = "//*[@data-testid='property-card']"
+_AIRBNB_CARDS_XPATH = "//*[@data-testid='listing-card']"
+
+# data-testid of each card field, per platform
+_BOOKING_CARD_FIELDS = {
+    'title': 'title',
+    'price': 'price-and-discounted-price',
+    'location': 'address',
+    'rating': 'review-score'
+}
+
+_AIRBNB_CARD_FIELDS = {
+    'title': 'listing-card-name',
+    'price': 'listing-card-price',
+    'location': 'listing-card-location',
+    'rating': 'listing-card-rating'
+}
+
+@lru_cache(maxsize=256)
+def _parse_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD date; repeated criteria reuse the parsed value"""
+    return datetime.strptime(value, "%Y-%m-%d")
+
+@lru_cache(maxsize=256)
+def _booking_url(location: str, check_in: str, check_out: str, guests: int,
+                 max_price: Optional[float] = None) -> str:
+    """Direct Booking.com search URL, avoiding flaky UI interactions
+    
+    Filters go in ``nflt``: entire homes & apartments only and, with
+    ``max_price``, a nightly price cap in USD.
+    """
+    check_in_date = _parse_date(check_in)
+    check_out_date = _parse_date(check_out)
+    params = {
+        "ss": location,
+        "checkin_monthday": check_in_date.day,
+        "checkin_month": check_in_date.month,
+        "checkin_year": check_in_date.year,
+        "checkout_monthday": check_out_date.day,
+        "checkout_month": check_out_date.month,
+        "checkout_year": check_out_date.year,
+        "group_adults": max(guests, 1),
+        "no_rooms": 1,
+        "group_children": 0,
+        "map": 0,
+        "order": "price",
+        "selected_currency": "USD",
+        "nflt": _booking_filters(max_price)
+    }
+    return f"https://www.booking.com/searchresults.html?{urlencode(params)}"
+
+def _booking_filters(max_price: Optional[float]) -> str:
+    filters = ["privacy_type=3"]  # Entire homes & apartments
+    if max_price:
+        filters.append(f"price=USD-min-{int(max_price)}-1")
+    return ";".join(filters)
+
+@lru_cache(maxsize=256)
+def _airbnb_url(location: str, check_in: str, check_out: str, guests: int) -> str:
+    """Direct Airbnb search URL (Airbnb URL params are more stable than UI)"""
+    qp = {
+        "query": location,
+        "adults": max(guests, 1),
+        "checkin": _parse_date(check_in).strftime("%Y-%m-%d"),
+        "checkout": _parse_date(check_out).strftime("%Y-%m-%d"),
+        "display_currency": "USD",
+        "price_filter_input_type": 0,
+        "price_filter_num_nights": 1,
+        # Page may ignore price param, but we still include a hint
+    }
+    return f"https://www.airbnb.com/s/{quote(location)}/homes?{urlencode(qp)}"
+
+# Column order of the CSV/JSON export
+_RESULT_FIELDS = (
+    'platform', 'title', 'price_per_night', 'total_price', 'location', 'rating',
+    'review_count', 'amenities', 'url', 'property_type', 'host_name',
+    'instant_book', 'cancellation_policy'
+)
+
+def _result_rows(results: Dict[str, List["PropertyListing"]]):
+    """Yield one flat export row per listing"""
+    for listings in results.values():
+        for listing in listings:
+            yield {
+                'platform': listing.platform,
+                'title': listing.title,
+                'price_per_night': listing.price_per_night,
+                'total_price': listing.total_price,
+                'location': listing.location,
+                'rating': listing.rating,
+                'review_count': listing.review_count,
+                'amenities': ', '.join(listing.amenities),
+                'url': listing.url,
+                'property_type': listing.property_type,
+                'host_name': listing.host_name,
+                'instant_book': listing.instant_book,
+                'cancellation_policy': listing.cancellation_policy
+            }
+
+def _testid_text(node, testid: str) -> Optional[str]:
+    """Whitespace-normalized text of the first descendant with a data-testid"""
+    matches = node.xpath(f".//*[@data-testid='{testid}']")
+    if not matches:
+        return None
+    return ' '.join(matches[0].text_content().split())
+
+def _html_tree(html: str, base_url: str):
+    """Parse markup with lxml, resolving links against the page URL"""
+    tree = lxml.html.fromstring(html)
+    tree.make_links_absolute(base_url)
+    return tree
+
+def _node_fields(card, testids: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Read a card's text fields and first link from a parsed HTML tree"""
+    fields = {name: _testid_text(card, testid) for name, testid in testids.items()}
+    hrefs = card.xpath(".//a/@href")
+    fields['url'] = hrefs[0] if hrefs else None
+    return fields
+
 @dataclass
 class SearchCriteria:
     location: str
@@ -31,7 +286,18 @@ class SearchCriteria:
     
     def __post_init__(self):
         if self.amenities is None:
-            self.amenities = ["kitchen", "wifi", "air_conditioning"]
+            self.amenities = list(DEFAULT_AMENITIES)
+        # Validate the dates up front; the parsed values are cached
+        _parse_date(self.check_in)
+        _parse_date(self.check_out)
+    
+    @property
+    def check_in_date(self) -> datetime:
+        return _parse_date(self.check_in)
+    
+    @property
+    def check_out_date(self) -> datetime:
+        return _parse_date(self.check_out)
 
 @dataclass
 class PropertyListing:
@@ -49,27 +315,180 @@ class PropertyListing:
     instant_book: bool = False
     cancellation_policy: Optional[str] = None
 
+class DriverPool:
+    """Bounded pool of warm browser sessions shared by agents in this process
+    
+    Idle drivers are kept per headless mode, so a new agent can skip the
+    Chrome cold start. Drivers released beyond ``max_idle`` are quit.
+    """
+    
+    def __init__(self, max_idle: int = 4):
+        self.max_idle = max_idle
+        self._idle: Dict[bool, queue.Queue] = {}
+        self._lock = threading.Lock()
+    
+    def _queue(self, headless: bool) -> queue.Queue:
+        with self._lock:
+            if headless not in self._idle:
+                self._idle[headless] = queue.Queue(maxsize=self.max_idle)
+            return self._idle[headless]
+    
+    def acquire(self, headless: bool, factory: Callable[[], Any]):
+        """Check out an idle driver, launching a new one if none is free"""
+        idle = self._queue(headless)
+        while True:
+            try:
+                driver = idle.get_nowait()
+            except queue.Empty:
+                return factory()
+            if self._is_alive(driver):
+                return driver
+            self._quit(driver)
+    
+    def prewarm(self, headless: bool, factory: Callable[[], Any], count: int):
+        """Launch drivers side by side until ``count`` are idle, up to ``max_idle``"""
+        missing = min(count, self.max_idle) - self._queue(headless).qsize()
+        if missing <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            futures = [executor.submit(factory) for _ in range(missing)]
+        for future in futures:
+            try:
+                self.release(future.result(), headless)
+            except Exception as e:
+                logger.warning(f"Could not prewarm browser: {e}")
+    
+    def release(self, driver, headless: bool):
+        """Check a driver back in, quitting it if the pool is full"""
+        try:
+            self._queue(headless).put_nowait(driver)
+        except queue.Full:
+            self._quit(driver)
+    
+    def shutdown(self):
+        """Quit every idle driver"""
+        with self._lock:
+            queues = list(self._idle.values())
+        for idle in queues:
+            while True:
+                try:
+                    driver = idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._quit(driver)
+    
+    @staticmethod
+    def _is_alive(driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error quitting driver: {e}")
+        _release_profile_dir(getattr(driver, 'profile_dir', None))
+
+# Shared by every agent; idle browsers are closed when the interpreter exits
+driver_pool = DriverPool()
+atexit.register(driver_pool.shutdown)
+
 class AccommodationSearchAgent:
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = True):
         self.headless = headless
-        self.driver = None
         self.ua = UserAgent()
-        self.setup_driver()
+        self.http = self.setup_http_session()
+        self._local = threading.local()
+        self._driver = None
+        # One browser session per platform so searches can run side by side
+        self._drivers: Dict[str, uc.Chrome] = {}
+        self._driver_locks: Dict[str, threading.Lock] = {}
+    
+    @property
+    def driver(self):
+        """Driver bound to the calling worker thread, or the primary driver
         
-    def setup_driver(self):
+        Browsers start on first use, so searches answered over plain HTTP
+        never launch Chrome. A thread running a platform search gets that
+        platform's session; otherwise the Booking.com session doubles as
+        the primary driver.
+        """
+        driver = getattr(self._local, 'driver', None)
+        if driver is not None:
+            return driver
+        platform = getattr(self._local, 'platform', None)
+        if platform is not None:
+            self._local.driver = self.setup_driver(platform)
+            return self._local.driver
+        if self._driver is None:
+            self._driver = self.setup_driver('booking_com')
+        return self._driver
+    
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+    
+    def setup_http_session(self) -> requests.Session:
+        """Setup a keep-alive HTTP session shared by all non-browser requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': self.ua.random,
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+        return session
+    
+    def setup_driver(self, platform: str = 'booking_com'):
+        """Return the browser session for a platform, checking one out on first use"""
+        if platform not in self._drivers:
+            self._drivers[platform] = driver_pool.acquire(self.headless, self._create_driver)
+        return self._drivers[platform]
+    
+    @contextmanager
+    def _borrow_driver(self):
+        """Check out a pooled browser for one task, returning it afterwards"""
+        driver = driver_pool.acquire(self.headless, self._create_driver)
+        try:
+            yield driver
+        finally:
+            driver_pool.release(driver, self.headless)
+    
+    def _create_driver(self):
         """Setup Chrome driver with anti-detection measures"""
+        profile_dir = _claim_profile_dir(self.headless)
         try:
             chrome_options = Options()
             # Headless handling for modern Chrome
             if self.headless:
                 chrome_options.add_argument("--headless=new")
             
+            # Return on DOMContentLoaded; callers wait for the elements they need
+            chrome_options.page_load_strategy = 'eager'
+            
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
             chrome_options.add_argument("--disable-blink-features=AutomationControlled")
             chrome_options.add_argument("--disable-gpu")
             chrome_options.add_argument("--window-size=1920,1080")
             chrome_options.add_argument(f"--user-agent={self.ua.random}")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--disable-background-networking")
+            chrome_options.add_argument("--disable-renderer-backgrounding")
+            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+            
+            # Only text and attributes are scraped, so skip images and CSS
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.managed_default_content_settings.stylesheets": 2,
+                "profile.default_content_setting_values.notifications": 2
+            })
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
             
             # Use system chrome if present
             try:
@@ -81,50 +500,57 @@ class AccommodationSearchAgent:
                 pass
             
             # Use undetected-chromedriver for better anti-detection
-            self.driver = uc.Chrome(options=chrome_options)
+            with _uc_start_lock:
+                driver = uc.Chrome(options=chrome_options)
             try:
-                self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+                driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             except Exception:
                 pass
             
         except Exception as e:
-            logger.error(f"Failed to setup driver: {e}")
-            # Fallback to regular selenium
-            self.driver = webdriver.Chrome(options=chrome_options)
+            logger.warning(f"undetected-chromedriver failed ({e}); falling back to plain Selenium "
+                           "without anti-detection")
+            try:
+                driver = webdriver.Chrome(options=chrome_options)
+            except Exception:
+                _release_profile_dir(profile_dir)
+                raise
+        
+        driver.profile_dir = profile_dir
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+        except Exception as e:
+            logger.debug(f"Could not block font and tracker requests: {e}")
+        # Explicit waits only, so a lookup for a missing element returns at once
+        driver.implicitly_wait(0)
+        return driver
     
     def search_booking_com(self, criteria: SearchCriteria) -> List[PropertyListing]:
         """Search for accommodations on Booking.com"""
         logger.info(f"Searching Booking.com for {criteria.location}")
         
         try:
-            # Build direct search URL to avoid flaky UI interactions
-            from urllib.parse import urlencode
-            check_in = datetime.strptime(criteria.check_in, "%Y-%m-%d")
-            check_out = datetime.strptime(criteria.check_out, "%Y-%m-%d")
-            params = {
-                "ss": criteria.location,
-                "checkin_monthday": check_in.day,
-                "checkin_month": check_in.month,
-                "checkin_year": check_in.year,
-                "checkout_monthday": check_out.day,
-                "checkout_month": check_out.month,
-                "checkout_year": check_out.year,
-                "group_adults": max(criteria.guests, 1),
-                "no_rooms": 1,
-                "group_children": 0,
-                "map": 0,
-                "order": "price"
-            }
-            url = f"https://www.booking.com/searchresults.html?{urlencode(params)}"
+            url = _booking_url(criteria.location, criteria.check_in, criteria.check_out, criteria.guests,
+                               criteria.max_price_per_night)
+            
+            # Results are server-rendered, so try without a browser first
+            listings = self.fetch_booking_results(url)
+            if listings:
+                logger.info(f"Found {len(listings)} properties on Booking.com")
+                return listings
+            
+            # Fall back to the browser when the page needs JavaScript
             self.driver.get(url)
-            time.sleep(5)
+            self.wait_for_results(_BOOKING_RESULTS)
             self.accept_cookies()
             
-            # Apply filters
-            self.apply_booking_filters(criteria)
+            # Filters normally ride in the URL; clicking them again would toggle them off
+            if "nflt=" not in url:
+                self.apply_booking_filters(criteria)
             
             # Extract results
-            listings = self.extract_booking_results()
+            listings = self.extract_booking_results(wait=False)
             
             logger.info(f"Found {len(listings)} properties on Booking.com")
             return listings
@@ -133,35 +559,35 @@ class AccommodationSearchAgent:
             logger.error(f"Error searching Booking.com: {e}")
             return []
     
+    def fetch_booking_results(self, url: str) -> List[PropertyListing]:
+        """Fetch and parse Booking.com results over plain HTTP"""
+        try:
+            response = self.http.get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            tree = _html_tree(response.text, response.url)
+        except Exception as e:
+            logger.debug(f"HTTP fetch of Booking.com results failed: {e}")
+            return []
+        
+        # An empty result here usually means a JavaScript challenge page
+        cards = [_node_fields(card, _BOOKING_CARD_FIELDS) for card in tree.xpath(_BOOKING_CARDS_XPATH)[:20]]
+        return self._listings_from_fields("Booking.com", "apartment", cards)
+    
     def search_airbnb(self, criteria: SearchCriteria) -> List[PropertyListing]:
         """Search for accommodations on Airbnb"""
         logger.info(f"Searching Airbnb for {criteria.location}")
         
         try:
-            # Build direct search URL (Airbnb URL params are more stable than UI)
-            from urllib.parse import urlencode, quote
-            check_in = datetime.strptime(criteria.check_in, "%Y-%m-%d").strftime("%Y-%m-%d")
-            check_out = datetime.strptime(criteria.check_out, "%Y-%m-%d").strftime("%Y-%m-%d")
-            qp = {
-                "query": criteria.location,
-                "adults": max(criteria.guests, 1),
-                "checkin": check_in,
-                "checkout": check_out,
-                "display_currency": "USD",
-                "price_filter_input_type": 0,
-                "price_filter_num_nights": 1,
-                # Page may ignore price param, but we still include a hint
-            }
-            url = f"https://www.airbnb.com/s/{quote(criteria.location)}/homes?{urlencode(qp)}"
+            url = _airbnb_url(criteria.location, criteria.check_in, criteria.check_out, criteria.guests)
             self.driver.get(url)
-            time.sleep(7)
+            self.wait_for_results(_AIRBNB_RESULTS)
             self.accept_cookies()
             
             # Apply filters
             self.apply_airbnb_filters(criteria)
             
             # Extract results
-            listings = self.extract_airbnb_results()
+            listings = self.extract_airbnb_results(wait=False)
             
             logger.info(f"Found {len(listings)} properties on Airbnb")
             return listings
@@ -170,29 +596,39 @@ class AccommodationSearchAgent:
             logger.error(f"Error searching Airbnb: {e}")
             return []
     
+    def wait_for_results(self, locator: Tuple[str, str], timeout: int = 10):
+        """Block until result cards render, instead of sleeping a fixed time"""
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located(locator))
+        except TimeoutException:
+            logger.debug(f"No results matching {locator[1]} after {timeout}s")
+    
+    def _wait_for_refresh(self, stale_cards: list, locator: Tuple[str, str], timeout: int = 10):
+        """Block until previously rendered cards are replaced by new results"""
+        if not stale_cards:
+            return
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.all_of(
+                EC.staleness_of(stale_cards[0]),
+                EC.presence_of_element_located(locator)
+            ))
+        except TimeoutException:
+            logger.debug("Results did not refresh after applying filters")
+    
     def accept_cookies(self):
         """Accept cookies on various platforms"""
         try:
-            # Common cookie accept selectors
-            cookie_selectors = [
-                "button[data-testid='cookie-banner-accept']",
-                "button[aria-label*='Accept']",
-                "button[aria-label*='Accept all']",
-                ".cookie-accept",
-                "#onetrust-accept-btn-handler"
-            ]
-            
-            for selector in cookie_selectors:
-                try:
-                    element = WebDriverWait(self.driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    element.click()
-                    time.sleep(1)
-                    break
-                except TimeoutException:
-                    continue
-                    
+            # Warm profiles keep the consent cookie from earlier runs
+            if any(cookie['name'] == _CONSENT_COOKIE for cookie in self.driver.get_cookies()):
+                return
+            
+            # One 5s wait covers every selector instead of 5s per selector
+            element = WebDriverWait(self.driver, 5).until(_COOKIE_BUTTON_CLICKABLE)
+            element.click()
+            time.sleep(1)
+            
+        except TimeoutException:
+            logger.debug("No cookie banner found or already accepted")
         except Exception as e:
             logger.debug(f"No cookie banner found or already accepted: {e}")
     
@@ -221,12 +657,10 @@ class AccommodationSearchAgent:
             check_in_input.click()
             
             # Select check-in date
-            check_in_date = datetime.strptime(criteria.check_in, "%Y-%m-%d")
-            self.select_date(check_in_date)
+            self.select_date(criteria.check_in_date)
             
             # Select check-out date
-            check_out_date = datetime.strptime(criteria.check_out, "%Y-%m-%d")
-            self.select_date(check_out_date)
+            self.select_date(criteria.check_out_date)
             
             # Guests
             guests_button = self.driver.find_element(By.CSS_SELECTOR, "button[data-testid='occupancy-config']")
@@ -271,9 +705,7 @@ class AccommodationSearchAgent:
             check_in_button.click()
             
             # Select dates
-            check_in_date = datetime.strptime(criteria.check_in, "%Y-%m-%d")
-            check_out_date = datetime.strptime(criteria.check_out, "%Y-%m-%d")
-            self.select_airbnb_dates(check_in_date, check_out_date)
+            self.select_airbnb_dates(criteria.check_in_date, criteria.check_out_date)
             
             # Guests
             guests_button = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='structured-search-input-field-guests-button']")
@@ -333,33 +765,52 @@ class AccommodationSearchAgent:
     def apply_booking_filters(self, criteria: SearchCriteria):
         """Apply filters on Booking.com"""
         try:
-            # Property type filter - Entire homes & apartments
+            # Wait once for whichever filter control renders first
             try:
-                property_filter = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-testid='property-type-filter']"))
-                )
-                property_filter.click()
-                
-                entire_place = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='entire-place-filter']")
-                entire_place.click()
+                WebDriverWait(self.driver, 10).until(EC.any_of(
+                    EC.element_to_be_clickable(_BOOKING_PROPERTY_FILTER),
+                    EC.element_to_be_clickable(_BOOKING_PRICE_FILTER)
+                ))
             except TimeoutException:
+                logger.debug("Booking.com filters not found")
+                return
+            
+            current_cards = self.driver.find_elements(*_BOOKING_RESULTS)[:1]
+            applied = False
+            
+            # Property type filter - Entire homes & apartments
+            # (find_elements returns [] for a missing control instead of raising)
+            property_filter = self.driver.find_elements(*_BOOKING_PROPERTY_FILTER)
+            if property_filter:
+                property_filter[0].click()
+                
+                entire_place = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='entire-place-filter']")
+                if entire_place:
+                    entire_place[0].click()
+                    applied = True
+            else:
                 logger.debug("Property type filter not found")
             
             # Price filter
-            try:
-                price_filter = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='price-filter']")
-                price_filter.click()
+            price_filter = self.driver.find_elements(*_BOOKING_PRICE_FILTER)
+            if price_filter:
+                price_filter[0].click()
                 
-                max_price_input = self.driver.find_element(By.CSS_SELECTOR, "input[data-testid='price-max']")
-                max_price_input.clear()
-                max_price_input.send_keys(str(int(criteria.max_price_per_night)))
-                
-                apply_button = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='filter-button']")
-                apply_button.click()
-            except TimeoutException:
+                try:
+                    max_price_input = self.driver.find_element(By.CSS_SELECTOR, "input[data-testid='price-max']")
+                    max_price_input.clear()
+                    max_price_input.send_keys(str(int(criteria.max_price_per_night)))
+                    
+                    apply_button = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='filter-button']")
+                    apply_button.click()
+                    applied = True
+                except NoSuchElementException:
+                    logger.debug("Price filter controls not found")
+            else:
                 logger.debug("Price filter not found")
             
-            time.sleep(3)
+            if applied:
+                self._wait_for_refresh(current_cards, _BOOKING_RESULTS)
             
         except Exception as e:
             logger.error(f"Error applying Booking.com filters: {e}")
@@ -369,6 +820,7 @@ class AccommodationSearchAgent:
         try:
             # Property type filter
             try:
+                current_cards = self.driver.find_elements(*_AIRBNB_RESULTS)[:1]
                 filters_button = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "[data-testid='filter-button']"))
                 )
@@ -386,63 +838,54 @@ class AccommodationSearchAgent:
                 # Apply filters
                 show_button = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='filter-button-show']")
                 show_button.click()
+                self._wait_for_refresh(current_cards, _AIRBNB_RESULTS)
                 
             except TimeoutException:
                 logger.debug("Airbnb filters not found")
             
-            time.sleep(3)
-            
         except Exception as e:
             logger.error(f"Error applying Airbnb filters: {e}")
     
-    def extract_booking_results(self) -> List[PropertyListing]:
-        """Extract property listings from Booking.com results"""
+    def extract_booking_results(self, wait: bool = True) -> List[PropertyListing]:
+        """Extract property listings from Booking.com results
+        
+        Pass ``wait=False`` when the caller has already waited for the cards.
+        """
         listings = []
         
         try:
             # Wait for results to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='property-card']"))
-            )
+            if wait:
+                WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(_BOOKING_RESULTS))
             
-            # Get all property cards
-            property_cards = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='property-card']")
+            # Load the rendered page once and read the first 20 cards locally
+            tree = self._page_tree()
+            cards = [_node_fields(card, _BOOKING_CARD_FIELDS) for card in tree.xpath(_BOOKING_CARDS_XPATH)[:20]]
             
-            for card in property_cards[:20]:  # Limit to first 20 results
-                try:
-                    listing = self.parse_booking_card(card)
-                    if listing:
-                        listings.append(listing)
-                except Exception as e:
-                    logger.debug(f"Error parsing booking card: {e}")
-                    continue
+            listings = self._listings_from_fields("Booking.com", "apartment", cards)
             
         except Exception as e:
             logger.error(f"Error extracting Booking.com results: {e}")
         
         return listings
     
-    def extract_airbnb_results(self) -> List[PropertyListing]:
-        """Extract property listings from Airbnb results"""
+    def extract_airbnb_results(self, wait: bool = True) -> List[PropertyListing]:
+        """Extract property listings from Airbnb results
+        
+        Pass ``wait=False`` when the caller has already waited for the cards.
+        """
         listings = []
         
         try:
             # Wait for results to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-testid='listing-card']"))
-            )
+            if wait:
+                WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(_AIRBNB_RESULTS))
             
-            # Get all listing cards
-            listing_cards = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='listing-card']")
+            # Load the rendered page once and read the first 20 cards locally
+            tree = self._page_tree()
+            cards = [_node_fields(card, _AIRBNB_CARD_FIELDS) for card in tree.xpath(_AIRBNB_CARDS_XPATH)[:20]]
             
-            for card in listing_cards[:20]:  # Limit to first 20 results
-                try:
-                    listing = self.parse_airbnb_card(card)
-                    if listing:
-                        listings.append(listing)
-                except Exception as e:
-                    logger.debug(f"Error parsing Airbnb card: {e}")
-                    continue
+            listings = self._listings_from_fields("Airbnb", "entire_place", cards)
             
         except Exception as e:
             logger.error(f"Error extracting Airbnb results: {e}")
@@ -452,40 +895,7 @@ class AccommodationSearchAgent:
     def parse_booking_card(self, card) -> Optional[PropertyListing]:
         """Parse a Booking.com property card"""
         try:
-            # Title
-            title = card.find_element(By.CSS_SELECTOR, "[data-testid='title']").text
-            
-            # Price
-            price_element = card.find_element(By.CSS_SELECTOR, "[data-testid='price-and-discounted-price']")
-            price_text = price_element.text
-            price_per_night = self.extract_price(price_text)
-            
-            # Location
-            location = card.find_element(By.CSS_SELECTOR, "[data-testid='address']").text
-            
-            # Rating
-            try:
-                rating_element = card.find_element(By.CSS_SELECTOR, "[data-testid='review-score']")
-                rating = float(rating_element.text.split()[0])
-            except:
-                rating = None
-            
-            # URL
-            url = card.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-            
-            return PropertyListing(
-                platform="Booking.com",
-                title=title,
-                price_per_night=price_per_night,
-                total_price=price_per_night,  # Will be calculated later
-                location=location,
-                rating=rating,
-                review_count=None,
-                amenities=[],
-                url=url,
-                property_type="apartment"
-            )
-            
+            return self._listing_from_card("Booking.com", "apartment", _BOOKING_CARD_FIELDS, card)
         except Exception as e:
             logger.debug(f"Error parsing booking card: {e}")
             return None
@@ -493,112 +903,216 @@ class AccommodationSearchAgent:
     def parse_airbnb_card(self, card) -> Optional[PropertyListing]:
         """Parse an Airbnb listing card"""
         try:
-            # Title
-            title = card.find_element(By.CSS_SELECTOR, "[data-testid='listing-card-name']").text
-            
-            # Price
-            price_element = card.find_element(By.CSS_SELECTOR, "[data-testid='listing-card-price']")
-            price_text = price_element.text
-            price_per_night = self.extract_price(price_text)
-            
-            # Location
-            location = card.find_element(By.CSS_SELECTOR, "[data-testid='listing-card-location']").text
-            
+            return self._listing_from_card("Airbnb", "entire_place", _AIRBNB_CARD_FIELDS, card)
+        except Exception as e:
+            logger.debug(f"Error parsing Airbnb card: {e}")
+            return None
+    
+    def _page_tree(self):
+        """Load the current page's markup once so it can be queried locally"""
+        return _html_tree(self.driver.page_source, self.driver.current_url)
+    
+    def _listing_from_card(self, platform: str, property_type: str,
+                           testids: Dict[str, str], card) -> Optional[PropertyListing]:
+        """Load a card element's markup once and read its fields locally"""
+        tree = _html_tree(card.get_attribute('outerHTML'), self.driver.current_url)
+        listings = self._listings_from_fields(platform, property_type, [_node_fields(tree, testids)])
+        return listings[0] if listings else None
+    
+    def _listings_from_fields(self, platform: str, property_type: str,
+                              cards: List[Dict[str, Optional[str]]]) -> List[PropertyListing]:
+        """Build listings from raw card text; title, price and location are required"""
+        complete = []
+        for fields in cards:
+            if not fields.get('title') or fields.get('price') is None or fields.get('location') is None:
+                logger.debug(f"Skipping incomplete {platform} card: {fields}")
+                continue
+            complete.append(fields)
+        
+        prices = [_extract_price(fields['price']) for fields in complete]
+        
+        listings = []
+        for fields, price_per_night in zip(complete, prices):
             # Rating
             try:
-                rating_element = card.find_element(By.CSS_SELECTOR, "[data-testid='listing-card-rating']")
-                rating = float(rating_element.text.split()[0])
-            except:
+                rating = float(fields['rating'].split()[0]) if fields.get('rating') else None
+            except ValueError:
                 rating = None
             
-            # URL
-            url = card.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-            
-            return PropertyListing(
-                platform="Airbnb",
-                title=title,
+            listings.append(PropertyListing(
+                platform=platform,
+                title=fields['title'],
                 price_per_night=price_per_night,
                 total_price=price_per_night,  # Will be calculated later
-                location=location,
+                location=fields['location'],
                 rating=rating,
                 review_count=None,
                 amenities=[],
-                url=url,
-                property_type="entire_place"
-            )
-            
-        except Exception as e:
-            logger.debug(f"Error parsing Airbnb card: {e}")
-            return None
+                url=fields.get('url') or "",
+                property_type=property_type
+            ))
+        
+        return listings
     
     def extract_price(self, price_text: str) -> float:
         """Extract numeric price from price text"""
-        import re
-        try:
-            # Remove currency symbols and extract numbers
-            price_match = re.search(r'[\d,]+\.?\d*', price_text.replace(',', ''))
-            if price_match:
-                return float(price_match.group())
-            return 0.0
-        except:
+        if not price_text:
             return 0.0
+        return _extract_price(price_text)
+    
+    def _search_on_platform(self, platform: str, search, criteria: SearchCriteria) -> List[PropertyListing]:
+        """Run a platform search on that platform's own browser session"""
+        lock = self._driver_locks.setdefault(platform, threading.Lock())
+        with lock, self._bound_platform(platform):
+            return search(criteria)
+    
+    @contextmanager
+    def _bound_platform(self, platform: str):
+        """Give the calling thread that platform's session, started on first use"""
+        previous = (getattr(self._local, 'platform', None), getattr(self._local, 'driver', None))
+        self._local.platform, self._local.driver = platform, None
+        try:
+            yield
+        finally:
+            self._local.platform, self._local.driver = previous
+    
+    @contextmanager
+    def _bound_driver(self, driver):
+        """Point self.driver at the given session for the calling thread"""
+        previous = getattr(self._local, 'driver', None)
+        self._local.driver = driver
+        try:
+            yield driver
+        finally:
+            self._local.driver = previous
     
-    def search_accommodations(self, criteria: SearchCriteria) -> Dict[str, List[PropertyListing]]:
-        """Search both platforms and return results"""
+    def search_accommodations(self, criteria: SearchCriteria,
+                              enrich: bool = False) -> Dict[str, List[PropertyListing]]:
+        """Search both platforms concurrently and return results
+        
+        Pass ``enrich=True`` to fill in amenities, host and cancellation
+        policy from each listing page; callers that scrape the pages
+        themselves leave it off.
+        """
+        searches = self._platform_searches()
         results = {}
         
-        # Search Booking.com
-        booking_results = self.search_booking_com(criteria)
-        results['booking_com'] = booking_results
+        # Each platform gets its own driver, so page loads overlap
+        with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+            futures = {
+                executor.submit(self._search_on_platform, platform, search, criteria): platform
+                for platform, search in searches.items()
+            }
+            for future in as_completed(futures):
+                platform = futures[future]
+                try:
+                    results[platform] = future.result()
+                except Exception as e:
+                    logger.error(f"Error searching {platform}: {e}")
+                    results[platform] = []
+        
+        # Keep a stable platform order for callers
+        results = {platform: results[platform] for platform in searches}
         
-        # Search Airbnb
-        airbnb_results = self.search_airbnb(criteria)
-        results['airbnb'] = airbnb_results
+        if enrich:
+            self.enrich_listings([l for listings in results.values() for l in listings])
         
         return results
     
-    def save_results(self, results: Dict[str, List[PropertyListing]], filename: str = None):
-        """Save search results to CSV and JSON"""
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"accommodation_search_{timestamp}"
+    async def search_accommodations_async(self, criteria: SearchCriteria,
+                                          enrich: bool = False) -> Dict[str, List[PropertyListing]]:
+        """Search both platforms without blocking the caller's event loop"""
+        loop = asyncio.get_running_loop()
+        searches = self._platform_searches()
+        
+        # Blocking Selenium work runs in the loop's executor, one task per platform
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(None, self._search_on_platform, platform, search, criteria)
+              for platform, search in searches.items()),
+            return_exceptions=True
+        )
+        
+        results = {}
+        for platform, outcome in zip(searches, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Error searching {platform}: {outcome}")
+                outcome = []
+            results[platform] = outcome
         
-        # Convert to DataFrame
-        all_listings = []
-        for platform, listings in results.items():
-            for listing in listings:
-                all_listings.append({
-                    'platform': listing.platform,
-                    'title': listing.title,
-                    'price_per_night': listing.price_per_night,
-                    'total_price': listing.total_price,
-                    'location': listing.location,
-                    'rating': listing.rating,
-                    'review_count': listing.review_count,
-                    'amenities': ', '.join(listing.amenities),
-                    'url': listing.url,
-                    'property_type': listing.property_type,
-                    'host_name': listing.host_name,
-                    'instant_book': listing.instant_book,
-                    'cancellation_policy': listing.cancellation_policy
-                })
+        if enrich:
+            all_listings = [l for listings in results.values() for l in listings]
+            await loop.run_in_executor(None, self.enrich_listings, all_listings)
         
-        df = pd.DataFrame(all_listings)
+        return results
+    
+    def _platform_searches(self) -> Dict[str, Callable[[SearchCriteria], List[PropertyListing]]]:
+        """Search method for each platform, keyed as in the results dict"""
+        return {
+            'booking_com': self.search_booking_com,
+            'airbnb': self.search_airbnb
+        }
+    
+    def enrich_listings(self, listings: List[PropertyListing]) -> List[PropertyListing]:
+        """Fill in amenities, host and cancellation policy from each listing page"""
+        targets = [listing for listing in listings if listing.url]
+        if targets:
+            # Bounded concurrency keeps the load on each site reasonable
+            with ThreadPoolExecutor(max_workers=ENRICH_CONCURRENCY) as executor:
+                list(executor.map(self._enrich_listing, targets))
+        return listings
+    
+    def _enrich_listing(self, listing: PropertyListing):
+        """Fetch one listing page over HTTP and copy over any missing details"""
+        try:
+            response = self.http.get(listing.url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            tree = lxml.html.fromstring(response.text)
+        except Exception as e:
+            logger.debug(f"Could not fetch details for {listing.title}: {e}")
+            return
         
-        # Save to CSV
-        df.to_csv(f"{filename}.csv", index=False)
+        if not listing.amenities:
+            items = (' '.join(li.text_content().split())
+                     for li in tree.xpath("//*[@data-testid='amenities']//li"))
+            listing.amenities = [item for item in items if item]
+        if not listing.host_name:
+            listing.host_name = _testid_text(tree, 'host-name')
+        if not listing.cancellation_policy:
+            listing.cancellation_policy = _testid_text(tree, 'cancellation-policy')
+    
+    def save_results(self, results: Dict[str, List[PropertyListing]], filename: str = None) -> int:
+        """Save search results to CSV and JSON, returning the number of rows written"""
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"accommodation_search_{timestamp}"
         
-        # Save to JSON
-        with open(f"{filename}.json", 'w') as f:
-            json.dump(all_listings, f, indent=2, default=str)
+        # Stream each row to both files in one pass instead of buffering them
+        count = 0
+        with open(f"{filename}.csv", 'w', newline='') as csv_file, \
+                open(f"{filename}.json", 'wb') as json_file:
+            writer = csv.DictWriter(csv_file, fieldnames=_RESULT_FIELDS)
+            writer.writeheader()
+            json_file.write(b'[')
+            for row in _result_rows(results):
+                writer.writerow(row)
+                json_file.write(b',\n' if count else b'\n')
+                json_file.write(orjson.dumps(row))
+                count += 1
+            json_file.write(b'\n]\n')
         
         logger.info(f"Results saved to {filename}.csv and {filename}.json")
-        return df
+        return count
     
     def close(self):
-        """Close the browser"""
-        if self.driver:
-            self.driver.quit()
+        """Return all browser sessions to the shared pool"""
+        drivers = list(self._drivers.values())
+        if self._driver and self._driver not in drivers:
+            drivers.append(self._driver)
+        for driver in drivers:
+            driver_pool.release(driver, self.headless)
+        self._drivers.clear()
+        self._driver = None
+        self.http.close()
 
 def main():
     """Example usage of the accommodation search agent"""
@@ -610,7 +1124,7 @@ def main():
         check_out="2024-09-15",
         guests=2,
         max_price_per_night=40.0,
-        amenities=["kitchen", "wifi", "air_conditioning"]
+        amenities=list(DEFAULT_AMENITIES)
     )
     
     # Create agent
@@ -618,20 +1132,22 @@ def main():
     
     try:
         # Search for accommodations
-        results = agent.search_accommodations(criteria)
+        # The saved results include amenities and host details
+        results = asyncio.run(agent.search_accommodations_async(criteria, enrich=True))
         
         # Save results
-        df = agent.save_results(results)
+        saved = agent.save_results(results)
         
         # Display summary
         print(f"\nSearch Results Summary:")
         print(f"Booking.com: {len(results['booking_com'])} properties")
         print(f"Airbnb: {len(results['airbnb'])} properties")
         
-        if not df.empty:
+        if saved:
             print(f"\nTop 5 cheapest properties:")
-            top_5 = df.nsmallest(5, 'price_per_night')[['platform', 'title', 'price_per_night', 'location']]
-            print(top_5.to_string(index=False))
+            all_listings = [l for listings in results.values() for l in listings]
+            for l in heapq.nsmallest(5, all_listings, key=lambda l: l.price_per_night):
+                print(f"{l.platform:<12} {l.title[:40]:<40} ${l.price_per_night:>8.2f}  {l.location}")
         
     finally:
         agent.close()
@@ -1,10 +1,17 @@
 import time
-import json
-import pandas as pd
+import hashlib
+import orjson
+import random
+import threading
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -17,14 +24,109 @@ from fake_useragent import UserAgent
 import logging
 import re
 from pathlib import Path
+from lxml import etree
 
 # Import the base agent
-from accommodation_agent import AccommodationSearchAgent, SearchCriteria, PropertyListing
+from accommodation_agent import (
+    AccommodationSearchAgent, SearchCriteria, PropertyListing, DEFAULT_AMENITIES, driver_pool,
+    _html_tree, _testid_text
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Any of these means the property page has rendered its details
+_DETAIL_CONTENT = (
+    By.CSS_SELECTOR,
+    "[data-testid='description'], [data-testid='property-details'], [data-testid='amenities']"
+)
+
+# Property pages loaded at once from any single site
+DETAIL_REQUESTS_PER_DOMAIN = 2
+
+# Seconds a cached property page stays fresh
+DETAIL_CACHE_TTL = 24 * 60 * 60
+
+_DIGITS = re.compile(r'\d+')
+
+def _first_int(text: str) -> Optional[int]:
+    """First run of digits in the text as an int, or None if there is none"""
+    match = _DIGITS.search(text)
+    return int(match.group()) if match else None
+
+# Property page sections, compiled once and run against a parsed page
+_DESCRIPTION = etree.XPath("//*[@data-testid='description']")
+_DETAIL_SPANS = etree.XPath("//*[@data-testid='property-details']//span")
+_PRICE_ROWS = etree.XPath("//*[@data-testid='price-breakdown']//div")
+_HOST_PROFILE = etree.XPath("//*[@data-testid='host-profile']")
+_FEATURE_ITEMS = etree.XPath("//*[@data-testid='amenities']//li")
+_HOUSE_RULE_ITEMS = etree.XPath("//*[@data-testid='house-rules']//li")
+
+def _node_text(node) -> str:
+    """Whitespace-normalized text of an element, as the browser would show it"""
+    return ' '.join(node.text_content().split())
+
+@lru_cache(maxsize=8192)
+def _norm(text: str) -> str:
+    """Lowercased, trimmed text for keyword checks; boilerplate lines repeat across pages"""
+    return text.lower().strip()
+
+def _positive_prices(listings: List[PropertyListing]) -> np.ndarray:
+    """Nightly prices of the listings as one array, without missing (zero) prices"""
+    prices = np.fromiter((l.price_per_night for l in listings), dtype=np.float64, count=len(listings))
+    return prices[prices > 0]
+
+# Areas ranked by distance from Bar, with the location score for each
+REGION_BAR, REGION_NEARBY, REGION_OTHER = 0, 1, 2
+_REGION_SCORES = (80.0, 60.0, 40.0)
+
+def _listing_region(location: str) -> int:
+    """Region of a lowercased location string"""
+    if "bar" in location:
+        return REGION_BAR
+    if "sutomore" in location or "petrovac" in location:
+        return REGION_NEARBY
+    return REGION_OTHER
+
+def _score_batch(listings: List["DetailedPropertyListing"], criteria: SearchCriteria) -> np.ndarray:
+    """Value scores for a batch of listings
+    
+    Weights: price 40%, wanted amenities 30%, rating 20%, host rating 10%.
+    A missing price, rating or amenity list contributes nothing.
+    """
+    max_price = criteria.max_price_per_night
+    wanted = frozenset(a.lower() for a in criteria.amenities)
+    n_wanted = len(wanted)
+    
+    # One pass over the listings collects every column the scores need
+    rows = []
+    append = rows.append
+    for listing in listings:
+        amenity_set = listing._amenity_set
+        append((
+            listing.price_per_night,
+            listing.rating or 0,
+            listing.host_rating or 0,
+            len(wanted & amenity_set) if amenity_set else -1,
+        ))
+    if not rows:
+        return np.zeros(0)
+    prices, ratings, host_ratings, overlaps = np.array(rows, dtype=np.float64).T
+    
+    # Price score (lower is better)
+    scores = np.where(prices > 0, np.maximum(0, 100 - prices / max_price * 100) * 0.4, 0)
+    
+    # Amenities score: share of the wanted amenities each listing has (-1 means none listed)
+    if n_wanted:
+        scores += np.where(overlaps >= 0, overlaps / n_wanted * 100 * 0.3, 0)
+    
+    # Rating and host scores
+    scores += ratings / 5.0 * 100 * 0.2
+    scores += host_ratings / 5.0 * 100 * 0.1
+    
+    return scores
+
 @dataclass
 class DetailedPropertyListing(PropertyListing):
     """Extended property listing with detailed information"""
@@ -63,6 +165,11 @@ class DetailedPropertyListing(PropertyListing):
     value_score: Optional[float] = None
     location_score: Optional[float] = None
     overall_score: Optional[float] = None
+    
+    def __post_init__(self):
+        # Normalized lookups; not fields, so never serialized
+        self._amenity_set = frozenset(a.lower() for a in self.amenities or ())
+        self._region = _listing_region((self.location or "").lower())
 
 @dataclass
 class SearchAnalysis:
@@ -79,189 +186,289 @@ class SearchAnalysis:
 class AdvancedAccommodationAgent(AccommodationSearchAgent):
     """Advanced accommodation search agent with detailed analysis capabilities"""
     
-    def __init__(self, headless: bool = False, data_dir: str = "data"):
+    def __init__(self, headless: bool = True, data_dir: str = "data"):
         super().__init__(headless)
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.detail_cache_dir = self.data_dir / "detail_cache"
+        self.detail_cache_dir.mkdir(exist_ok=True)
+        self._prune_detail_cache()
         self.search_history = []
         
-    def get_detailed_property_info(self, listing: PropertyListing) -> DetailedPropertyListing:
-        """Get detailed information about a specific property"""
+    def get_detailed_property_info(self, listing: PropertyListing, criteria: Optional[SearchCriteria] = None,
+                                   driver=None) -> DetailedPropertyListing:
+        """Get detailed information about a specific property
+        
+        With ``criteria``, pages scraped for the same dates within the last
+        day are served from the on-disk cache. Pass ``driver`` to load the
+        page on that browser session instead of the agent's own.
+        """
+        cached = self.get_cached_detail(listing, criteria)
+        if cached is not None:
+            return cached
+        return self._scrape_detailed_property_info(listing, criteria, driver)
+    
+    def _scrape_detailed_property_info(self, listing: PropertyListing, criteria: Optional[SearchCriteria],
+                                       driver=None) -> DetailedPropertyListing:
         logger.info(f"Getting detailed info for: {listing.title}")
         
         try:
-            # Navigate to property page
-            self.driver.get(listing.url)
-            time.sleep(3)
-            
-            # Accept cookies if present
-            self.accept_cookies()
-            
-            # Extract detailed information
-            detailed_info = self.extract_detailed_property_info()
-            
-            # Convert to DetailedPropertyListing
-            detailed_listing = DetailedPropertyListing(
-                platform=listing.platform,
-                title=listing.title,
-                price_per_night=listing.price_per_night,
-                total_price=listing.total_price,
-                location=listing.location,
-                rating=listing.rating,
-                review_count=listing.review_count,
-                amenities=listing.amenities,
-                url=listing.url,
-                property_type=listing.property_type,
-                host_name=listing.host_name,
-                instant_book=listing.instant_book,
-                cancellation_policy=listing.cancellation_policy,
-                **detailed_info
-            )
-            
-            return detailed_listing
-            
+            with self._bound_driver(driver or self.driver):
+                detailed_info = self._fetch_detailed_property_info(listing)
         except Exception as e:
             logger.error(f"Error getting detailed info for {listing.title}: {e}")
-            return DetailedPropertyListing(
-                platform=listing.platform,
-                title=listing.title,
-                price_per_night=listing.price_per_night,
-                total_price=listing.total_price,
-                location=listing.location,
-                rating=listing.rating,
-                review_count=listing.review_count,
-                amenities=listing.amenities,
-                url=listing.url,
-                property_type=listing.property_type,
-                host_name=listing.host_name,
-                instant_book=listing.instant_book,
-                cancellation_policy=listing.cancellation_policy
-            )
-    
-    def extract_detailed_property_info(self) -> Dict[str, Any]:
-        """Extract detailed property information from the current page"""
+            return self._detailed_listing(listing)
+        
+        # Empty results come from blocked or error pages, which are not worth keeping
+        if criteria is not None and detailed_info:
+            self._store_detail(self._detail_cache_path(listing, criteria), listing, detailed_info)
+        return self._detailed_listing(listing, detailed_info)
+    
+    def _fetch_detailed_property_info(self, listing: PropertyListing) -> Dict[str, Any]:
+        # Navigate to property page
+        self.driver.get(listing.url)
+        try:
+            WebDriverWait(self.driver, 10).until(EC.presence_of_element_located(_DETAIL_CONTENT))
+        except TimeoutException:
+            logger.debug(f"Property details did not render for: {listing.title}")
+        
+        # Accept cookies if present
+        self.accept_cookies()
+        
+        # Extract detailed information
+        return self.extract_detailed_property_info()
+    
+    @staticmethod
+    def _detailed_listing(listing: PropertyListing,
+                          detailed_info: Optional[Dict[str, Any]] = None) -> DetailedPropertyListing:
+        """Combine a search result with the details scraped from its page"""
+        return DetailedPropertyListing(
+            platform=listing.platform,
+            title=listing.title,
+            price_per_night=listing.price_per_night,
+            total_price=listing.total_price,
+            location=listing.location,
+            rating=listing.rating,
+            review_count=listing.review_count,
+            amenities=listing.amenities,
+            url=listing.url,
+            property_type=listing.property_type,
+            host_name=listing.host_name,
+            instant_book=listing.instant_book,
+            cancellation_policy=listing.cancellation_policy,
+            **(detailed_info or {})
+        )
+    
+    def _detail_cache_path(self, listing: PropertyListing, criteria: SearchCriteria) -> Path:
+        key = hashlib.blake2b(
+            f"{listing.url}|{criteria.check_in}|{criteria.check_out}".encode(), digest_size=16
+        ).hexdigest()
+        return self.detail_cache_dir / f"{key}.json"
+    
+    def get_cached_detail(self, listing: PropertyListing,
+                          criteria: Optional[SearchCriteria]) -> Optional[DetailedPropertyListing]:
+        """Return the cached details for a listing, or None if missing or stale
+        
+        Only the page details are cached; price, title and rating come from
+        ``listing`` so a hit never serves an outdated search result.
+        """
+        if criteria is None or not listing.url:
+            return None
+        path = self._detail_cache_path(listing, criteria)
+        try:
+            if time.time() - path.stat().st_mtime > DETAIL_CACHE_TTL:
+                path.unlink(missing_ok=True)
+                return None
+            return self._detailed_listing(listing, orjson.loads(path.read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return None
+    
+    def _prune_detail_cache(self):
+        """Delete cache files past their TTL, including temp files left by crashed writes"""
+        cutoff = time.time() - DETAIL_CACHE_TTL
+        for path in self.detail_cache_dir.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _store_detail(path: Path, listing: PropertyListing, detailed_info: Dict[str, Any]):
+        # Write to a temp file first so concurrent readers never see half a record
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(orjson.dumps(detailed_info))
+            tmp_path.replace(path)
+        except (OSError, TypeError) as e:
+            logger.debug(f"Could not cache details for {listing.url}: {e}")
+    
+    def extract_detailed_property_info(self, html: Optional[str] = None) -> Dict[str, Any]:
+        """Extract detailed property information from the current page
+        
+        Reads a parsed copy of the page, so the browser is asked for its
+        markup once rather than once per field. Pass ``html`` to use markup
+        that was already fetched. Sections whose test id does not appear
+        anywhere in the markup are skipped without walking the tree.
+        """
         info = {}
         
         try:
+            if html is None:
+                html = self.driver.page_source
+            
+            # Blocked or error pages carry none of the sections below
+            if 'data-testid' not in html:
+                logger.debug("No property sections on page, skipping detail extraction")
+                return info
+            
+            has_price_breakdown = 'price-breakdown' in html
+            has_host_profile = 'host-profile' in html
+            has_amenities = 'amenities' in html
+            tree = _html_tree(html, self.driver.current_url)
+            
             # Description
-            try:
-                description_element = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='description']")
-                info['description'] = description_element.text
-            except:
-                info['description'] = None
+            descriptions = _DESCRIPTION(tree)
+            info['description'] = _node_text(descriptions[0]) if descriptions else None
             
             # Property details (bedrooms, bathrooms, etc.)
-            try:
-                details_elements = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='property-details'] span")
-                for element in details_elements:
-                    text = element.text.lower()
-                    if 'bedroom' in text:
-                        info['bedrooms'] = int(re.search(r'\d+', text).group())
-                    elif 'bathroom' in text:
-                        info['bathrooms'] = int(re.search(r'\d+', text).group())
-                    elif 'guest' in text:
-                        info['max_guests'] = int(re.search(r'\d+', text).group())
-            except:
-                pass
+            for element in _DETAIL_SPANS(tree):
+                text = _norm(_node_text(element))
+                if 'bedroom' in text:
+                    info['bedrooms'] = _first_int(text)
+                elif 'bathroom' in text:
+                    info['bathrooms'] = _first_int(text)
+                elif 'guest' in text:
+                    info['max_guests'] = _first_int(text)
             
             # Pricing details
-            try:
-                price_breakdown = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='price-breakdown'] div")
-                for element in price_breakdown:
-                    text = element.text.lower()
-                    if 'cleaning' in text:
-                        info['cleaning_fee'] = self.extract_price(text)
-                    elif 'service' in text:
-                        info['service_fee'] = self.extract_price(text)
-                    elif 'tax' in text:
-                        info['taxes'] = self.extract_price(text)
-                    elif 'deposit' in text:
-                        info['security_deposit'] = self.extract_price(text)
-            except:
-                pass
+            for element in (_PRICE_ROWS(tree) if has_price_breakdown else ()):
+                text = _norm(_node_text(element))
+                if 'cleaning' in text:
+                    info['cleaning_fee'] = self.extract_price(text)
+                elif 'service' in text:
+                    info['service_fee'] = self.extract_price(text)
+                elif 'tax' in text:
+                    info['taxes'] = self.extract_price(text)
+                elif 'deposit' in text:
+                    info['security_deposit'] = self.extract_price(text)
             
             # Host information
-            try:
-                host_section = self.driver.find_element(By.CSS_SELECTOR, "[data-testid='host-profile']")
-                host_name = host_section.find_element(By.CSS_SELECTOR, "[data-testid='host-name']").text
+            host_sections = _HOST_PROFILE(tree) if has_host_profile else []
+            host_name = _testid_text(host_sections[0], 'host-name') if host_sections else None
+            if host_name is not None:
                 info['host_name'] = host_name
                 
                 # Host rating
+                host_rating = _testid_text(host_sections[0], 'host-rating')
                 try:
-                    host_rating = host_section.find_element(By.CSS_SELECTOR, "[data-testid='host-rating']").text
                     info['host_rating'] = float(host_rating.split()[0])
-                except:
+                except (AttributeError, IndexError, ValueError):
                     pass
                 
                 # Response time
-                try:
-                    response_time = host_section.find_element(By.CSS_SELECTOR, "[data-testid='response-time']").text
+                response_time = _testid_text(host_sections[0], 'response-time')
+                if response_time is not None:
                     info['host_response_time'] = response_time
-                except:
-                    pass
-                
-            except:
-                pass
             
             # Property features
-            try:
-                features_elements = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='amenities'] li")
-                info['property_features'] = [elem.text for elem in features_elements]
-            except:
-                info['property_features'] = []
+            info['property_features'] = [_node_text(elem) for elem in _FEATURE_ITEMS(tree)] if has_amenities else []
             
             # House rules
-            try:
-                rules_elements = self.driver.find_elements(By.CSS_SELECTOR, "[data-testid='house-rules'] li")
-                info['house_rules'] = [elem.text for elem in rules_elements]
-            except:
-                info['house_rules'] = []
+            info['house_rules'] = [_node_text(elem) for elem in _HOUSE_RULE_ITEMS(tree)]
             
         except Exception as e:
             logger.error(f"Error extracting detailed property info: {e}")
         
         return info
     
+    def get_detailed_listings(self, listings: List[PropertyListing],
+                              criteria: Optional[SearchCriteria] = None) -> List[DetailedPropertyListing]:
+        """Load property pages concurrently, each worker on its own browser session
+        
+        Cached pages are not reloaded. Results come back in the order of ``listings``.
+        """
+        detailed_listings = [self.get_cached_detail(listing, criteria) for listing in listings]
+        misses = [i for i, detailed in enumerate(detailed_listings) if detailed is None]
+        to_fetch = [listings[i] for i in misses]
+        domain_slots = {
+            urlparse(listing.url).netloc: threading.Semaphore(DETAIL_REQUESTS_PER_DOMAIN)
+            for listing in to_fetch
+        }
+        
+        def fetch(listing: PropertyListing) -> DetailedPropertyListing:
+            with domain_slots[urlparse(listing.url).netloc]:
+                with self._borrow_driver() as driver:
+                    detailed_listing = self._scrape_detailed_property_info(listing, criteria, driver)
+                time.sleep(random.uniform(0, 0.5))  # Be respectful to the websites
+            return detailed_listing
+        
+        # One worker per domain slot, but never more browsers than the pool keeps idle
+        workers = max(min(DETAIL_REQUESTS_PER_DOMAIN * len(domain_slots), driver_pool.max_idle), 1)
+        
+        # Pay the browser cold starts up front, all at once
+        if to_fetch:
+            driver_pool.prewarm(self.headless, self._create_driver, min(len(to_fetch), workers))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i, detailed_listing in zip(misses, executor.map(fetch, to_fetch)):
+                detailed_listings[i] = detailed_listing
+        
+        if len(misses) < len(listings):
+            logger.info(f"Served {len(listings) - len(misses)} of {len(listings)} properties from the detail cache")
+        return detailed_listings
+    
     def analyze_search_results(self, results: Dict[str, List[PropertyListing]], 
                              criteria: SearchCriteria) -> SearchAnalysis:
         """Analyze search results and provide insights"""
         logger.info("Analyzing search results...")
         
         # Get detailed information for top properties
-        detailed_listings = []
         all_listings = []
+        top_listings = []
         
         for platform, listings in results.items():
             all_listings.extend(listings)
             
             # Get detailed info for top 5 properties from each platform
-            top_listings = sorted(listings, key=lambda x: x.price_per_night)[:5]
-            for listing in top_listings:
-                detailed_listing = self.get_detailed_property_info(listing)
-                detailed_listings.append(detailed_listing)
-                time.sleep(2)  # Be respectful to the websites
+            top_listings.extend(sorted(listings, key=lambda x: x.price_per_night)[:5])
+        
+        detailed_listings = self.get_detailed_listings(top_listings, criteria)
         
         # Calculate scores for detailed listings
-        for listing in detailed_listings:
-            listing.value_score = self.calculate_value_score(listing, criteria)
-            listing.location_score = self.calculate_location_score(listing, criteria)
-            listing.overall_score = (listing.value_score + listing.location_score) / 2
+        value_scores = self.calculate_value_scores(detailed_listings, criteria)
+        location_scores = np.fromiter(
+            (self.calculate_location_score(l, criteria) for l in detailed_listings),
+            dtype=np.float64, count=len(detailed_listings)
+        )
+        overall_scores = (value_scores + location_scores) / 2
+        for listing, value_score, location_score, overall_score in zip(
+                detailed_listings, value_scores.tolist(), location_scores.tolist(), overall_scores.tolist()):
+            listing.value_score = value_score
+            listing.location_score = location_score
+            listing.overall_score = overall_score
         
-        # Sort by overall score
-        detailed_listings.sort(key=lambda x: x.overall_score or 0, reverse=True)
+        # Rank once by overall score; a stable sort keeps ties in search order
+        ranked = [detailed_listings[i] for i in np.argsort(-overall_scores, kind='stable')]
         
         # Calculate statistics
-        prices = [l.price_per_night for l in all_listings if l.price_per_night > 0]
-        avg_price = np.mean(prices) if prices else 0
-        price_range = (min(prices), max(prices)) if prices else (0, 0)
+        prices = _positive_prices(all_listings)
+        avg_price = float(prices.mean()) if prices.size else 0
+        price_range = (float(prices.min()), float(prices.max())) if prices.size else (0, 0)
         
-        # Categorize properties
+        # Categorize properties, best first
         budget_threshold = criteria.max_price_per_night * 0.8
         premium_threshold = criteria.max_price_per_night * 1.2
         
-        budget_options = [l for l in detailed_listings if l.price_per_night <= budget_threshold]
-        premium_options = [l for l in detailed_listings if l.price_per_night >= premium_threshold]
-        best_value = detailed_listings[:5]  # Top 5 by overall score
+        budget_options = []
+        premium_options = []
+        for listing in ranked:
+            price = listing.price_per_night
+            if price <= budget_threshold:
+                budget_options.append(listing)
+            elif price >= premium_threshold:
+                premium_options.append(listing)
+        best_value = ranked[:5]  # Top 5 by overall score
         
         # Generate recommendations
         recommendations = self.generate_recommendations(detailed_listings, criteria)
@@ -282,46 +489,19 @@ class AdvancedAccommodationAgent(AccommodationSearchAgent):
     
     def calculate_value_score(self, listing: DetailedPropertyListing, criteria: SearchCriteria) -> float:
         """Calculate value score based on price and amenities"""
-        score = 0.0
-        
-        # Price score (lower is better)
-        if listing.price_per_night > 0:
-            price_score = max(0, 100 - (listing.price_per_night / criteria.max_price_per_night) * 100)
-            score += price_score * 0.4
-        
-        # Amenities score
-        if listing.amenities:
-            amenity_score = len([a for a in criteria.amenities if a in listing.amenities]) / len(criteria.amenities) * 100
-            score += amenity_score * 0.3
-        
-        # Rating score
-        if listing.rating:
-            rating_score = (listing.rating / 5.0) * 100
-            score += rating_score * 0.2
-        
-        # Host score
-        if listing.host_rating:
-            host_score = (listing.host_rating / 5.0) * 100
-            score += host_score * 0.1
-        
-        return score
+        return float(self.calculate_value_scores([listing], criteria)[0])
+    
+    def calculate_value_scores(self, listings: List[DetailedPropertyListing],
+                               criteria: SearchCriteria) -> np.ndarray:
+        """Value scores for many listings at once, in the order given"""
+        return _score_batch(listings, criteria)
     
     def calculate_location_score(self, listing: DetailedPropertyListing, criteria: SearchCriteria) -> float:
         """Calculate location score based on proximity and area quality"""
-        score = 0.0
-        
         # Distance score (assuming closer to Bar is better)
-        if "bar" in listing.location.lower():
-            score += 80
-        elif "sutomore" in listing.location.lower() or "petrovac" in listing.location.lower():
-            score += 60
-        else:
-            score += 40
-        
         # Additional location factors could be added here
         # (e.g., proximity to beach, restaurants, transportation)
-        
-        return score
+        return _REGION_SCORES[listing._region]
     
     def generate_recommendations(self, listings: List[DetailedPropertyListing], 
                                criteria: SearchCriteria) -> List[str]:
@@ -333,7 +513,8 @@ class AdvancedAccommodationAgent(AccommodationSearchAgent):
             return recommendations
         
         # Price analysis
-        avg_price = np.mean([l.price_per_night for l in listings if l.price_per_night > 0])
+        prices = _positive_prices(listings)
+        avg_price = prices.mean() if prices.size else 0
         if avg_price > criteria.max_price_per_night:
             recommendations.append(f"Average price (${avg_price:.0f}) is above your budget. Consider traveling in shoulder season or expanding your search area.")
         
@@ -342,7 +523,7 @@ class AdvancedAccommodationAgent(AccommodationSearchAgent):
         recommendations.append(f"Best value option: {best_value.title} at ${best_value.price_per_night}/night")
         
         # Location recommendations
-        bar_properties = [l for l in listings if "bar" in l.location.lower()]
+        bar_properties = [l for l in listings if l._region == REGION_BAR]
         if bar_properties:
             recommendations.append(f"Found {len(bar_properties)} properties in Bar area - ideal for your location preference")
         
@@ -361,37 +542,37 @@ class AdvancedAccommodationAgent(AccommodationSearchAgent):
         if not listings:
             return insights
         
+        # One pass turns the listings into columns: platform codes and prices
+        platform_codes = {}
+        amenity_counts = Counter()
+        codes = np.empty(len(listings), dtype=np.intp)
+        all_prices = np.empty(len(listings), dtype=np.float64)
+        for i, listing in enumerate(listings):
+            codes[i] = platform_codes.setdefault(listing.platform, len(platform_codes))
+            all_prices[i] = listing.price_per_night
+            amenity_counts.update(listing.amenities)
+        
         # Price distribution
-        prices = [l.price_per_night for l in listings if l.price_per_night > 0]
-        insights['price_distribution'] = {
-            'min': min(prices),
-            'max': max(prices),
-            'median': np.median(prices),
-            'std': np.std(prices)
+        prices = all_prices[all_prices > 0]
+        if prices.size:
+            low, median, high = np.percentile(prices, (0, 50, 100))
+            insights['price_distribution'] = {
+                'min': float(low),
+                'max': float(high),
+                'median': float(median),
+                'std': float(prices.std())
+            }
+        
+        # Platform comparison, grouped by platform code
+        counts = np.bincount(codes)
+        sums = np.bincount(codes, weights=all_prices)
+        insights['platform_comparison'] = {
+            platform: {'count': int(counts[code]), 'avg_price': float(sums[code] / counts[code])}
+            for platform, code in platform_codes.items()
         }
         
-        # Platform comparison
-        platform_stats = {}
-        for listing in listings:
-            platform = listing.platform
-            if platform not in platform_stats:
-                platform_stats[platform] = {'count': 0, 'avg_price': 0, 'prices': []}
-            
-            platform_stats[platform]['count'] += 1
-            platform_stats[platform]['prices'].append(listing.price_per_night)
-        
-        for platform, stats in platform_stats.items():
-            stats['avg_price'] = np.mean(stats['prices'])
-        
-        insights['platform_comparison'] = platform_stats
-        
         # Amenity analysis
-        amenity_counts = {}
-        for listing in listings:
-            for amenity in listing.amenities:
-                amenity_counts[amenity] = amenity_counts.get(amenity, 0) + 1
-        
-        insights['popular_amenities'] = sorted(amenity_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        insights['popular_amenities'] = amenity_counts.most_common(10)
         
         return insights
     
@@ -401,10 +582,12 @@ class AdvancedAccommodationAgent(AccommodationSearchAgent):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"accommodation_report_{timestamp}"
         
-        # Save detailed listings to JSON
-        detailed_listings = []
-        for listing in analysis.best_value_properties + analysis.budget_options + analysis.premium_options:
-            detailed_listings.append(asdict(listing))
+        # Save detailed listings to JSON; orjson serializes the dataclasses itself.
+        # A listing can be both a top pick and a budget option, so keep one copy.
+        detailed_listings = list({
+            id(listing): listing
+            for listing in chain(analysis.best_value_properties, analysis.budget_options, analysis.premium_options)
+        }.values())
         
         # Save to JSON
         output_data = {
@@ -418,8 +601,11 @@ class AdvancedAccommodationAgent(AccommodationSearchAgent):
             'detailed_listings': detailed_listings
         }
         
-        with open(self.data_dir / f"{filename}.json", 'w') as f:
-            json.dump(output_data, f, indent=2, default=str)
+        (self.data_dir / f"{filename}.json").write_bytes(orjson.dumps(
+            output_data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        ))
         
         # Generate markdown and HTML reports
         from report_generator import ReportGenerator
@@ -485,7 +671,7 @@ def main():
         check_out="2024-09-15",
         guests=2,
         max_price_per_night=40.0,
-        amenities=["kitchen", "wifi", "air_conditioning"]
+        amenities=list(DEFAULT_AMENITIES)
     )
     
     # Create advanced agent
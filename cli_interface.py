@@ -3,47 +3,75 @@
 Command Line Interface for Accommodation Search Agent
 """
 
-import argparse
 import sys
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-# Import our agents
-from accommodation_agent import AccommodationSearchAgent, SearchCriteria
-from advanced_accommodation_agent import AdvancedAccommodationAgent
+USAGE = """usage: cli_interface.py [-h] [--quick | --interactive] [--headless]
+
+Accommodation Search Agent
+
+options:
+  -h, --help     show this help message and exit
+  --quick        Run quick search with default settings
+  --interactive  Run interactive search (default)
+  --headless     Run browser in headless mode"""
+
+FLAGS = {"--quick", "--interactive", "--headless"}
+
+# Piped answers are read straight from stdin, skipping input()'s readline setup
+_IS_TTY = sys.stdin.isatty()
+
+def _read(prompt: str) -> str:
+    """Show a prompt and read one line of input"""
+    if _IS_TTY:
+        return input(prompt)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        # Match input() so retry loops stop at the end of piped input
+        raise EOFError
+    return line.rstrip("\n")
+
+def format_prompt(prompt: str, default: str = None) -> str:
+    """Prompt text shown to the user, with the default in brackets if there is one"""
+    return f"{prompt} [{default}]: " if default is not None else f"{prompt}: "
+
+def ask(full_prompt: str, default: str = None) -> str:
+    """Read one answer for an already formatted prompt, falling back to the default"""
+    user_input = _read(full_prompt).strip()
+    if not user_input and default is not None:
+        return default
+    return user_input
 
 def get_user_input(prompt: str, default: str = None) -> str:
     """Get user input with optional default value"""
-    if default:
-        user_input = input(f"{prompt} [{default}]: ").strip()
-        return user_input if user_input else default
-    else:
-        return input(f"{prompt}: ").strip()
+    return ask(format_prompt(prompt, default), default)
 
 def get_date_input(prompt: str, default_days: int = None) -> str:
     """Get date input with optional default"""
+    default_date = None
     if default_days:
         default_date = (datetime.now() + timedelta(days=default_days)).strftime("%Y-%m-%d")
-        date_str = get_user_input(prompt, default_date)
-    else:
-        date_str = get_user_input(prompt)
     
-    # Validate date format
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-        return date_str
-    except ValueError:
-        print("❌ Invalid date format. Please use YYYY-MM-DD format.")
-        return get_date_input(prompt, default_days)
+    full_prompt = format_prompt(prompt, default_date)
+    while True:
+        date_str = ask(full_prompt, default_date)
+        
+        # Validate date format; isoformat() normalizes the forms newer Pythons also accept
+        try:
+            return date.fromisoformat(date_str).isoformat()
+        except ValueError:
+            print("❌ Invalid date format. Please use YYYY-MM-DD format.")
 
 def get_number_input(prompt: str, min_val: int = 1, max_val: int = 20, default: int = None) -> int:
     """Get numeric input with validation"""
+    default_str = str(default) if default is not None else None
+    full_prompt = format_prompt(prompt, default_str)
     while True:
         try:
-            if default:
-                user_input = get_user_input(prompt, str(default))
-            else:
-                user_input = get_user_input(prompt)
+            user_input = ask(full_prompt, default_str)
             
             value = int(user_input)
             if min_val <= value <= max_val:
@@ -55,12 +83,11 @@ def get_number_input(prompt: str, min_val: int = 1, max_val: int = 20, default:
 
 def get_float_input(prompt: str, min_val: float = 0, default: float = None) -> float:
     """Get float input with validation"""
+    default_str = str(default) if default is not None else None
+    full_prompt = format_prompt(prompt, default_str)
     while True:
         try:
-            if default:
-                user_input = get_user_input(prompt, str(default))
-            else:
-                user_input = get_user_input(prompt)
+            user_input = ask(full_prompt, default_str)
             
             value = float(user_input)
             if value >= min_val:
@@ -70,34 +97,53 @@ def get_float_input(prompt: str, min_val: float = 0, default: float = None) -> f
         except ValueError:
             print("❌ Please enter a valid number")
 
+_AMENITIES = (
+    "kitchen", "wifi", "air_conditioning", "parking", "washer",
+    "dryer", "tv", "balcony", "garden", "pool", "beach_access",
+    "restaurant", "gym", "spa", "pet_friendly"
+)
+_AMENITIES_BANNER = "\n".join(
+    f"   {i:2d}. {amenity.replace('_', ' ').title()}" for i, amenity in enumerate(_AMENITIES, 1)
+)
+
 def select_amenities() -> list:
     """Let user select amenities"""
-    available_amenities = [
-        "kitchen", "wifi", "air_conditioning", "parking", "washer", 
-        "dryer", "tv", "balcony", "garden", "pool", "beach_access",
-        "restaurant", "gym", "spa", "pet_friendly"
-    ]
+    from accommodation_agent import DEFAULT_AMENITIES
     
     print("\n🏠 Available amenities:")
-    for i, amenity in enumerate(available_amenities, 1):
-        print(f"   {i:2d}. {amenity.replace('_', ' ').title()}")
+    print(_AMENITIES_BANNER)
     
     print("\nSelect amenities (comma-separated numbers, or press Enter for default):")
-    user_input = input("Default: kitchen, wifi, air_conditioning: ").strip()
+    user_input = _read(f"Default: {', '.join(DEFAULT_AMENITIES)}: ").strip()
     
     if not user_input:
-        return ["kitchen", "wifi", "air_conditioning"]
+        return list(DEFAULT_AMENITIES)
     
     try:
-        selected_indices = [int(x.strip()) - 1 for x in user_input.split(",")]
-        selected_amenities = [available_amenities[i] for i in selected_indices if 0 <= i < len(available_amenities)]
-        return selected_amenities if selected_amenities else ["kitchen", "wifi", "air_conditioning"]
-    except (ValueError, IndexError):
+        numbers = (int(x) for x in user_input.split(","))
+        selected_amenities = [_AMENITIES[n - 1] for n in numbers if 1 <= n <= len(_AMENITIES)]
+        return selected_amenities if selected_amenities else list(DEFAULT_AMENITIES)
+    except ValueError:
         print("❌ Invalid selection. Using default amenities.")
-        return ["kitchen", "wifi", "air_conditioning"]
+        return list(DEFAULT_AMENITIES)
 
-def interactive_search():
+def _format_criteria(criteria) -> str:
+    """Indented, one-line-per-field summary of a SearchCriteria"""
+    return "\n".join([
+        f"   Location: {criteria.location}",
+        f"   Dates: {criteria.check_in} to {criteria.check_out}",
+        f"   Guests: {criteria.guests}",
+        f"   Max Price: ${criteria.max_price_per_night}/night",
+        f"   Property Type: {criteria.property_type}",
+        f"   Amenities: {', '.join(criteria.amenities)}",
+    ])
+
+def interactive_search(headless: bool = False):
     """Interactive search mode"""
+    # Agents pull in Selenium, so they load only once a search is starting
+    from accommodation_agent import AccommodationSearchAgent, SearchCriteria
+    from advanced_accommodation_agent import AdvancedAccommodationAgent
+    
     print("🏨 ACCOMMODATION SEARCH AGENT")
     print("=" * 50)
     
@@ -141,13 +187,8 @@ def interactive_search():
     )
     
     # Confirm search
-    print("\n🔍 Search Summary:")
-    print(f"   Location: {criteria.location}")
-    print(f"   Dates: {criteria.check_in} to {criteria.check_out}")
-    print(f"   Guests: {criteria.guests}")
-    print(f"   Max Price: ${criteria.max_price_per_night}/night")
-    print(f"   Property Type: {criteria.property_type}")
-    print(f"   Amenities: {', '.join(criteria.amenities)}")
+    criteria_summary = _format_criteria(criteria)
+    sys.stdout.write(f"\n🔍 Search Summary:\n{criteria_summary}\n")
     
     confirm = get_user_input("\nStart search? (y/n)", "y").lower()
     if confirm not in ['y', 'yes']:
@@ -163,18 +204,21 @@ def interactive_search():
     # Run search
     try:
         if agent_type == "1":
-            agent = AccommodationSearchAgent(headless=False)
+            agent = AccommodationSearchAgent(headless=headless)
             print("\n🔍 Searching for accommodations...")
-            results = agent.search_accommodations(criteria)
+            results = agent.search_accommodations(criteria, enrich=True)
             agent.save_results(results)
             
             # Display summary
-            print(f"\n✅ Search completed!")
-            print(f"   Booking.com: {len(results['booking_com'])} properties")
-            print(f"   Airbnb: {len(results['airbnb'])} properties")
+            sys.stdout.write("\n".join([
+                "\n✅ Search completed!",
+                criteria_summary,
+                f"   Booking.com: {len(results['booking_com'])} properties",
+                f"   Airbnb: {len(results['airbnb'])} properties",
+            ]) + "\n")
             
         else:
-            agent = AdvancedAccommodationAgent(headless=False)
+            agent = AdvancedAccommodationAgent(headless=headless)
             print("\n🔍 Searching for accommodations...")
             results = agent.search_accommodations(criteria)
             
@@ -185,19 +229,23 @@ def interactive_search():
             agent.save_detailed_analysis(analysis, criteria)
             
             # Display results
-            print(f"\n✅ Analysis completed!")
-            print(f"   Total properties: {analysis.total_properties_found}")
-            print(f"   Average price: ${analysis.average_price_per_night:.2f}/night")
-            print(f"   Price range: ${analysis.price_range[0]:.2f} - ${analysis.price_range[1]:.2f}")
+            lines = [
+                "\n✅ Analysis completed!",
+                criteria_summary,
+                f"   Total properties: {analysis.total_properties_found}",
+                f"   Average price: ${analysis.average_price_per_night:.2f}/night",
+                f"   Price range: ${analysis.price_range[0]:.2f} - ${analysis.price_range[1]:.2f}",
+            ]
             
             # Show top recommendations
             if analysis.best_value_properties:
-                print(f"\n🏆 Top Recommendations:")
+                lines.append("\n🏆 Top Recommendations:")
                 for i, prop in enumerate(analysis.best_value_properties[:3], 1):
-                    print(f"   {i}. {prop.title}")
-                    print(f"      Price: ${prop.price_per_night}/night | Rating: {prop.rating}/5" if prop.rating else f"      Price: ${prop.price_per_night}/night")
-                    print(f"      Location: {prop.location}")
-                    print()
+                    price_line = f"      Price: ${prop.price_per_night}/night"
+                    if prop.rating:
+                        price_line += f" | Rating: {prop.rating}/5"
+                    lines.append(f"   {i}. {prop.title}\n{price_line}\n      Location: {prop.location}\n")
+            sys.stdout.write("\n".join(lines) + "\n")
             
             # Provide booking assistance
             agent.automated_booking_assistant(analysis, criteria)
@@ -209,30 +257,32 @@ def interactive_search():
     except Exception as e:
         print(f"\n❌ Error during search: {e}")
 
-def quick_search():
+def quick_search(headless: bool = False):
     """Quick search with default settings"""
+    from accommodation_agent import DEFAULT_AMENITIES, SearchCriteria
+    from advanced_accommodation_agent import AdvancedAccommodationAgent
+    
     print("⚡ QUICK SEARCH MODE")
     print("=" * 30)
     
     # Use default criteria for Montenegro
+    now = datetime.now()
     criteria = SearchCriteria(
         location="Bar, Montenegro",
-        check_in=(datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
-        check_out=(datetime.now() + timedelta(days=44)).strftime("%Y-%m-%d"),
+        check_in=(now + timedelta(days=30)).strftime("%Y-%m-%d"),
+        check_out=(now + timedelta(days=44)).strftime("%Y-%m-%d"),
         guests=2,
         max_price_per_night=40.0,
-        amenities=["kitchen", "wifi", "air_conditioning"]
+        amenities=list(DEFAULT_AMENITIES)
     )
     
-    print(f"Searching for: {criteria.location}")
-    print(f"Dates: {criteria.check_in} to {criteria.check_out}")
-    print(f"Budget: ${criteria.max_price_per_night}/night")
+    print(f"Searching for:\n{_format_criteria(criteria)}")
     
     try:
-        agent = AdvancedAccommodationAgent(headless=False)
+        agent = AdvancedAccommodationAgent(headless=headless)
         results = agent.search_accommodations(criteria)
         analysis = agent.analyze_search_results(results, criteria)
-        agent.save_detailed_analysis(analysis)
+        agent.save_detailed_analysis(analysis, criteria)
         agent.automated_booking_assistant(analysis, criteria)
         agent.close()
         
@@ -241,17 +291,27 @@ def quick_search():
 
 def main():
     """Main CLI function"""
-    parser = argparse.ArgumentParser(description="Accommodation Search Agent")
-    parser.add_argument("--quick", action="store_true", help="Run quick search with default settings")
-    parser.add_argument("--interactive", action="store_true", help="Run interactive search (default)")
-    parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    argv = set(sys.argv[1:])
+    if "-h" in argv or "--help" in argv:
+        print(USAGE)
+        return
+    
+    unknown = argv - FLAGS
+    if unknown:
+        print(USAGE, file=sys.stderr)
+        print(f"cli_interface.py: error: unrecognized arguments: {' '.join(sorted(unknown))}", file=sys.stderr)
+        sys.exit(2)
     
-    args = parser.parse_args()
+    if {"--quick", "--interactive"} <= argv:
+        print(USAGE, file=sys.stderr)
+        print("cli_interface.py: error: argument --interactive: not allowed with argument --quick", file=sys.stderr)
+        sys.exit(2)
     
-    if args.quick:
-        quick_search()
+    headless = "--headless" in argv
+    if "--quick" in argv:
+        quick_search(headless)
     else:
-        interactive_search()
+        interactive_search(headless)
 
 if __name__ == "__main__":
     main()
@@ -4,9 +4,29 @@ Montenegro Accommodation Search Example
 Based on the montenegro_accommodation_strategy.md document
 """
 
+import json
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import replace
 from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+from accommodation_agent import AccommodationSearchAgent, DEFAULT_AMENITIES
 from advanced_accommodation_agent import AdvancedAccommodationAgent, SearchCriteria
 
+# Locations searched at once in the alternatives sweep
+ALTERNATIVE_WORKERS = 2
+
+STRATEGY_INSIGHTS = """
+📋 Strategy Insights:
+   • Search completed for Bar area with 10km radius
+   • Focused on entire homes & apartments only
+   • Prioritized properties with kitchen, WiFi, and AC
+   • September dates chosen for shoulder season pricing
+   • Results saved for comparison and analysis"""
+
 def search_montenegro_accommodations():
     """Search for accommodations in Montenegro based on the strategy document"""
     
@@ -22,16 +42,18 @@ def search_montenegro_accommodations():
         check_out="2024-09-15",  # 14 nights
         guests=2,
         max_price_per_night=40.0,  # $36/night target from strategy
-        amenities=["kitchen", "wifi", "air_conditioning", "parking"]
+        amenities=[*DEFAULT_AMENITIES, "parking"]
     )
     
-    print("🔍 Search Criteria:")
-    print(f"   Location: {criteria.location}")
-    print(f"   Dates: {criteria.check_in} to {criteria.check_out}")
-    print(f"   Guests: {criteria.guests}")
-    print(f"   Max Price: ${criteria.max_price_per_night}/night")
-    print(f"   Amenities: {', '.join(criteria.amenities)}")
-    print()
+    sys.stdout.write("\n".join([
+        "🔍 Search Criteria:",
+        f"   Location: {criteria.location}",
+        f"   Dates: {criteria.check_in} to {criteria.check_out}",
+        f"   Guests: {criteria.guests}",
+        f"   Max Price: ${criteria.max_price_per_night}/night",
+        f"   Amenities: {', '.join(criteria.amenities)}",
+        "",
+    ]) + "\n")
     
     # Create advanced agent
     agent = AdvancedAccommodationAgent(headless=False)
@@ -46,44 +68,44 @@ def search_montenegro_accommodations():
         analysis = agent.analyze_search_results(results, criteria)
         
         # Save detailed analysis
-        filename = f"montenegro_search_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        agent.save_detailed_analysis(analysis, filename)
+        now = datetime.now()
+        filename = (f"montenegro_search_{now.year}{now.month:02d}{now.day:02d}"
+                    f"_{now.hour:02d}{now.minute:02d}{now.second:02d}")
+        agent.save_detailed_analysis(analysis, criteria, filename)
         
         # Display results
-        print(f"\n✅ Search completed!")
-        print(f"   Total properties found: {analysis.total_properties_found}")
-        print(f"   Average price: ${analysis.average_price_per_night:.2f}/night")
-        print(f"   Price range: ${analysis.price_range[0]:.2f} - ${analysis.price_range[1]:.2f}")
+        lines = [
+            "\n✅ Search completed!",
+            f"   Total properties found: {analysis.total_properties_found}",
+            f"   Average price: ${analysis.average_price_per_night:.2f}/night",
+            f"   Price range: ${analysis.price_range[0]:.2f} - ${analysis.price_range[1]:.2f}",
+        ]
         
         # Show top recommendations
         if analysis.best_value_properties:
-            print(f"\n🏆 Top 5 Recommendations:")
+            lines.append("\n🏆 Top 5 Recommendations:")
             for i, prop in enumerate(analysis.best_value_properties[:5], 1):
-                print(f"   {i}. {prop.title}")
-                print(f"      Price: ${prop.price_per_night}/night")
-                print(f"      Location: {prop.location}")
+                lines.append(f"   {i}. {prop.title}")
+                lines.append(f"      Price: ${prop.price_per_night}/night")
+                lines.append(f"      Location: {prop.location}")
                 if prop.rating:
-                    print(f"      Rating: {prop.rating}/5")
-                print(f"      Platform: {prop.platform}")
-                print()
+                    lines.append(f"      Rating: {prop.rating}/5")
+                lines.append(f"      Platform: {prop.platform}")
+                lines.append("")
         
         # Show budget options
         if analysis.budget_options:
-            print(f"💰 Budget Options (≤${criteria.max_price_per_night * 0.8:.0f}/night):")
+            lines.append(f"💰 Budget Options (≤${criteria.max_price_per_night * 0.8:.0f}/night):")
             for i, prop in enumerate(analysis.budget_options[:3], 1):
-                print(f"   {i}. {prop.title} - ${prop.price_per_night}/night")
-            print()
+                lines.append(f"   {i}. {prop.title} - ${prop.price_per_night}/night")
+            lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Provide booking assistance
         agent.automated_booking_assistant(analysis, criteria)
         
         # Strategy insights
-        print("\n📋 Strategy Insights:")
-        print("   • Search completed for Bar area with 10km radius")
-        print("   • Focused on entire homes & apartments only")
-        print("   • Prioritized properties with kitchen, WiFi, and AC")
-        print("   • September dates chosen for shoulder season pricing")
-        print("   • Results saved for comparison and analysis")
+        print(STRATEGY_INSIGHTS)
         
     except Exception as e:
         print(f"❌ Error during search: {e}")
@@ -91,7 +113,7 @@ def search_montenegro_accommodations():
     finally:
         agent.close()
 
-def search_alternative_locations():
+def search_alternative_locations(headless: bool = False):
     """Search alternative locations mentioned in the strategy"""
     
     print("\n🗺️ Alternative Location Search")
@@ -106,43 +128,77 @@ def search_alternative_locations():
     ]
     
     criteria = SearchCriteria(
-        location="",  # Will be set for each location
+        location=alternative_locations[0],  # Replaced for each location
         check_in="2024-09-01",
         check_out="2024-09-15",
         guests=2,
         max_price_per_night=40.0,
-        amenities=["kitchen", "wifi", "air_conditioning"]
+        amenities=list(DEFAULT_AMENITIES)
     )
     
-    agent = AdvancedAccommodationAgent(headless=False)
-    
-    try:
-        for location in alternative_locations:
-            print(f"\n🔍 Searching {location}...")
-            criteria.location = location
+    print(f"\n🔍 Searching {', '.join(alternative_locations)}...")
+    
+    # Locations are searched a couple at a time, each on its own agent, so
+    # the sweep only runs a few browsers; each summary is appended as soon
+    # as it is known, so an interrupted run keeps the locations already
+    # searched
+    data_dir = Path("data")
+    data_dir.mkdir(exist_ok=True)
+    with open(data_dir / "alternatives.jsonl", "a", encoding="utf-8") as summaries, \
+            ThreadPoolExecutor(max_workers=ALTERNATIVE_WORKERS) as executor:
+        futures = {
+            executor.submit(search_location, replace(criteria, location=location), headless): location
+            for location in alternative_locations
+        }
+        for future in as_completed(futures):
+            location = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"❌ Error searching {location}: {e}")
+                continue
             
-            results = agent.search_accommodations(criteria)
+            # Quick summary from one array of every listed price
+            prices = np.fromiter(
+                (listing.price_per_night for listings in results.values() for listing in listings),
+                dtype=np.float64
+            )
+            total_properties = prices.size
+            prices = prices[prices > 0]
+            avg_price = float(prices.mean()) if prices.size else 0.0
+            quartiles = np.percentile(prices, (25, 50, 75)).round(2).tolist() if prices.size else None
             
-            # Quick summary
-            total_properties = sum(len(listings) for listings in results.values())
             if total_properties > 0:
-                prices = []
-                for listings in results.values():
-                    prices.extend([l.price_per_night for l in listings if l.price_per_night > 0])
-                
-                avg_price = sum(prices) / len(prices) if prices else 0
-                print(f"   Found {total_properties} properties")
-                print(f"   Average price: ${avg_price:.2f}/night")
+                lines = [
+                    f"\n📍 {location}",
+                    f"   Found {total_properties} properties",
+                    f"   Average price: ${avg_price:.2f}/night",
+                ]
+                if quartiles:
+                    q1, median, q3 = quartiles
+                    lines.append(f"   Median price: ${median:.2f}/night (middle half ${q1:.2f} - ${q3:.2f})")
+                sys.stdout.write("\n".join(lines) + "\n")
             else:
-                print("   No properties found")
+                sys.stdout.write(f"\n📍 {location}\n   No properties found\n")
             
-            # Be respectful with delays
-            import time
-            time.sleep(3)
-    
-    except Exception as e:
-        print(f"❌ Error searching alternatives: {e}")
-    
+            summaries.write(json.dumps({
+                'location': location,
+                'check_in': criteria.check_in,
+                'check_out': criteria.check_out,
+                'searched_at': datetime.now().isoformat(timespec='seconds'),
+                'total_properties': total_properties,
+                'average_price': round(avg_price, 2),
+                'price_quartiles': quartiles
+            }) + "\n")
+            summaries.flush()
+
+def search_location(criteria: SearchCriteria, headless: bool = False):
+    """Search one location on a dedicated agent, so searches can run in parallel"""
+    # Stagger the starts to be respectful to the websites
+    time.sleep(random.uniform(0, 3))
+    agent = AccommodationSearchAgent(headless=headless)
+    try:
+        return agent.search_accommodations(criteria)
     finally:
         agent.close()
 
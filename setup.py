@@ -7,6 +7,7 @@ import os
 import sys
 import subprocess
 import platform
+from importlib.util import find_spec
 from pathlib import Path
 
 def check_python_version():
@@ -29,49 +30,55 @@ def install_dependencies():
         print(f"❌ Failed to install dependencies: {e}")
         return False
 
+# Where each platform usually installs Chrome or Chromium
+CHROME_PATHS = {
+    "linux": (
+        "/usr/bin/google-chrome",
+        "/usr/bin/chromium-browser",
+        "/usr/bin/chromium",
+        "/snap/bin/chromium"
+    ),
+    "darwin": (
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    ),
+    "windows": (
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
+    ),
+}
+
+CHROME_INSTALL_HINTS = {
+    "linux": ("Chrome/Chromium not found. Please install:", "sudo apt-get install chromium-browser"),
+    "darwin": ("Chrome not found. Please install via Homebrew:", "brew install --cask google-chrome"),
+    "windows": ("Chrome not found. Please download from:", "https://www.google.com/chrome/"),
+}
+
+# Remembers the browser found by an earlier setup run
+CHROME_PATH_CACHE = Path("data") / ".chrome_path"
+
 def check_chrome():
     """Check if Chrome is installed"""
-    system = platform.system().lower()
+    if CHROME_PATH_CACHE.exists():
+        cached_path = CHROME_PATH_CACHE.read_text().strip()
+        if os.path.exists(cached_path):
+            print(f"✅ Chrome/Chromium found: {cached_path}")
+            return True
     
-    if system == "linux":
-        # Check for Chrome or Chromium
-        chrome_paths = [
-            "/usr/bin/google-chrome",
-            "/usr/bin/chromium-browser",
-            "/usr/bin/chromium",
-            "/snap/bin/chromium"
-        ]
-        for path in chrome_paths:
-            if os.path.exists(path):
-                print(f"✅ Chrome/Chromium found: {path}")
-                return True
-        print("⚠️  Chrome/Chromium not found. Please install:")
-        print("   sudo apt-get install chromium-browser")
-        return False
-        
-    elif system == "darwin":  # macOS
-        chrome_path = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        if os.path.exists(chrome_path):
-            print("✅ Chrome found on macOS")
+    system = platform.system().lower()
+    for path in CHROME_PATHS.get(system, ()):
+        if os.path.exists(path):
+            print(f"✅ Chrome/Chromium found: {path}")
+            try:
+                CHROME_PATH_CACHE.parent.mkdir(exist_ok=True)
+                CHROME_PATH_CACHE.write_text(path)
+            except OSError:
+                pass
             return True
-        print("⚠️  Chrome not found. Please install via Homebrew:")
-        print("   brew install --cask google-chrome")
-        return False
-        
-    elif system == "windows":
-        # Windows Chrome is usually in Program Files
-        chrome_paths = [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-        ]
-        for path in chrome_paths:
-            if os.path.exists(path):
-                print("✅ Chrome found on Windows")
-                return True
-        print("⚠️  Chrome not found. Please download from:")
-        print("   https://www.google.com/chrome/")
-        return False
     
+    if system in CHROME_INSTALL_HINTS:
+        message, hint = CHROME_INSTALL_HINTS[system]
+        print(f"⚠️  {message}")
+        print(f"   {hint}")
     return False
 
 def create_data_directory():
@@ -89,20 +96,21 @@ def make_executable():
         except Exception as e:
             print(f"⚠️  Could not make CLI executable: {e}")
 
+REQUIRED_MODULES = (
+    "selenium", "numpy", "undetected_chromedriver", "fake_useragent",
+    "requests", "lxml", "orjson"
+)
+
 def test_imports():
     """Test if all required modules can be imported"""
     print("\n🧪 Testing imports...")
-    try:
-        import selenium
-        import pandas
-        import numpy
-        import undetected_chromedriver
-        import fake_useragent
-        print("✅ All imports successful")
-        return True
-    except ImportError as e:
-        print(f"❌ Import error: {e}")
+    # Only presence matters here, so locate the modules without running them
+    missing = [name for name in REQUIRED_MODULES if find_spec(name) is None]
+    if missing:
+        print(f"❌ Import error: missing {', '.join(missing)}")
         return False
+    print("✅ All imports successful")
+    return True
 
 def main():
     """Main setup function"""
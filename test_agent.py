@@ -4,11 +4,12 @@ Test script for Accommodation Search Agent
 """
 
 import sys
-import time
-from accommodation_agent import AccommodationSearchAgent, SearchCriteria
 
 def test_basic_functionality():
     """Test basic agent functionality"""
+    # Loaded here so the module itself imports without Selenium
+    from accommodation_agent import AccommodationSearchAgent, SearchCriteria
+    
     print("🧪 Testing Accommodation Search Agent")
     print("=" * 40)
     
@@ -32,14 +33,12 @@ def test_basic_functionality():
     agent = AccommodationSearchAgent(headless=True)  # Headless for testing
     
     try:
-        # Test Booking.com search
-        print("🔍 Testing Booking.com search...")
-        booking_results = agent.search_booking_com(criteria)
+        # Test both searches at once; each platform runs on its own browser session
+        print("🔍 Testing Booking.com and Airbnb searches...")
+        results = agent.search_accommodations(criteria)
+        booking_results = results['booking_com']
+        airbnb_results = results['airbnb']
         print(f"   Found {len(booking_results)} properties on Booking.com")
-        
-        # Test Airbnb search
-        print("🔍 Testing Airbnb search...")
-        airbnb_results = agent.search_airbnb(criteria)
         print(f"   Found {len(airbnb_results)} properties on Airbnb")
         
         # Show sample results